@@ -1,12 +1,38 @@
 import argparse
+from collections import deque
+import contextlib
+import dataclasses
 import json
 import xml.etree.ElementTree as ET
-import xml.dom.minidom
+from xml.sax.saxutils import escape, quoteattr
 import logging
 import random
+import re
 from faker import Faker
 import datetime
+import importlib.util
 import os
+import mmap
+import stat
+import tempfile
+
+try:
+    import orjson  # Optional: much faster JSON encode/decode.
+except ImportError:
+    orjson = None
+
+try:
+    from lxml import etree as LET  # Optional: faster incremental XML parsing.
+except ImportError:
+    LET = None
+
+try:
+    import msgspec  # Optional: schema-guided JSON decoding (--schema).
+except ImportError:
+    msgspec = None
+
+# Decode errors raised for input that is valid JSON but does not fit the --schema type.
+_SCHEMA_ERRORS = (msgspec.ValidationError,) if msgspec is not None else ()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -14,13 +40,171 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(
 # Initialize Faker
 fake = Faker()
 
+# Number of pre-generated Faker words used for obfuscated XML tag names (a power of two).
+_WORD_POOL_SIZE = 1 << 16
+
+# Cheap shape check run before strptime, which is far slower at rejecting non-dates.
+_DATE_RE = re.compile(r'^[0-9]{4}-[0-9]{2}-[0-9]{2}\Z')
+_DATE_LEN = len('YYYY-MM-DD')
+# The same test applied to many candidates at once, joined one per line.
+_DATE_LINE_RE = re.compile(r'^[0-9]{4}-[0-9]{2}-[0-9]{2}$', re.MULTILINE)
+
+# Digit runs this long may not fit orjson's 64-bit integers (it would turn them into floats), so
+# input containing one is decoded with json instead.
+_LONG_DIGITS_RE = re.compile(rb'[0-9]{19}')
+
+# Output formats for obfuscated dates; indexed with two random bits, so keep exactly four.
+_FMTS = ('%m/%d/%Y', '%d.%m.%Y', '%Y/%m/%d', '%d-%b-%Y')
+
+# Output buffer size; streamed output is flushed to the OS in chunks of this size.
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Input files larger than this are memory-mapped rather than read into a buffer.
+_MMAP_THRESHOLD = 64 << 20
+
+# Namespace bound to the 'xml' prefix in every document.
+_XML_NAMESPACE = 'http://www.w3.org/XML/1998/namespace'
+
+# iterparse events consumed by the streaming XML path.
+_XML_EVENTS = ('start', 'end', 'start-ns')
+
+
+def _load_schema(path):
+    """
+    Imports the msgspec type named Schema from a Python file.
+
+    Args:
+        path (str): Path to a Python file defining Schema (usually a msgspec.Struct).
+
+    Returns:
+        type: The Schema type.
+
+    Raises:
+        ValueError: If msgspec is not installed or the file does not define Schema.
+    """
+    if msgspec is None:
+        raise ValueError("Schema-guided decoding requires the msgspec package.")
+    spec = importlib.util.spec_from_file_location("_obfuscator_schema", path)
+    if spec is None:
+        raise ValueError(f"Cannot import schema file: {path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not hasattr(module, 'Schema'):
+        raise ValueError(f"Schema file does not define 'Schema': {path}")
+    _check_schema(module.Schema)
+    return module.Schema
+
+
+def _check_schema(schema):
+    """
+    Rejects schemas containing object types the date walk cannot update.
+
+    msgspec also decodes attrs classes, which it reports as dataclass types.  Their fields cannot
+    be listed or replaced like those of a Struct or dataclass, so any dates in them would be left
+    as they are.
+
+    Raises:
+        ValueError: If the schema is not a type msgspec supports or contains an attrs class.
+    """
+    try:
+        info = msgspec.inspect.type_info(schema)
+    except TypeError as e:
+        raise ValueError(f"Unsupported schema type: {e}") from e
+    seen = set()
+    stack = [info]
+    while stack:
+        info = stack.pop()
+        if id(info) in seen:  # Recursive Structs refer back to the same type info.
+            continue
+        seen.add(id(info))
+        if isinstance(info, msgspec.inspect.DataclassType) and not dataclasses.is_dataclass(info.cls):
+            raise ValueError(f"Unsupported schema type: {info.cls.__name__} "
+                             "(use a msgspec.Struct or a dataclass)")
+        for field in getattr(info, 'fields', ()):
+            stack.append(field.type)
+        for name in ('item_type', 'key_type', 'value_type'):
+            if hasattr(info, name):
+                stack.append(getattr(info, name))
+        stack.extend(getattr(info, 'item_types', ()))
+        stack.extend(getattr(info, 'types', ()))
+
+
+def _should_mmap(f):
+    """
+    Returns True if the open file is large enough to be worth memory-mapping.
+    """
+    return os.fstat(f.fileno()).st_size > _MMAP_THRESHOLD
+
+
+def _new_file_mode(path):
+    """
+    Returns the permission bits open(path, 'w') would leave on path: its current ones if it
+    exists, otherwise 0o666 minus the umask.
+    """
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def _can_replace(path):
+    """
+    Returns True if path can be written by renaming a new file over it without changing what the
+    write affects: it does not exist yet, or it is a regular file that is not a symlink, has no
+    other hard links and is owned by us.  Anything else (e.g. /dev/stdout) is written in place.
+    """
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return True
+    return (stat.S_ISREG(st.st_mode) and st.st_nlink == 1
+            and (not hasattr(os, 'geteuid') or st.st_uid == os.geteuid()))
+
+
+@contextlib.contextmanager
+def _open_output(path, mode, **kwargs):
+    """
+    Opens an output file for writing so that an existing file is only replaced on success.
+
+    Where _can_replace allows it, the output goes to a temporary file next to path, which is
+    renamed over path once the with block finishes and removed if it raises.  Other paths, and
+    paths in a directory we cannot create files in, are opened directly.
+
+    Args:
+        path (str): Path of the output file.
+        mode (str): Write mode passed to open().
+        **kwargs: Further arguments for open().
+    """
+    fd = None
+    if _can_replace(path):
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                            prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+        except PermissionError:
+            pass
+    if fd is None:
+        with open(path, mode, **kwargs) as f:
+            yield f
+        return
+    try:
+        with open(fd, mode, **kwargs) as f:
+            yield f
+        os.chmod(tmp_path, _new_file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
 class DataFormatObfuscator:
     """
     Transforms data into a visually similar but structurally different format to prevent direct interpretation.
     Supports JSON to XML and date format changes.
     """
 
-    def __init__(self, input_file, output_file, transformation_type):
+    def __init__(self, input_file, output_file, transformation_type, pretty=False, schema=None, in_place=True):
         """
         Initializes the DataFormatObfuscator.
 
@@ -28,10 +212,51 @@ class DataFormatObfuscator:
             input_file (str): Path to the input file.
             output_file (str): Path to the output file.
             transformation_type (str): Type of transformation to apply (e.g., 'json_to_xml', 'date_obfuscation').
+            pretty (bool): Whether to indent generated XML for human readers.
+            schema (type): Optional msgspec type to decode JSON input with for date obfuscation.
+                Only the fields it declares are kept; its datetime.date fields and any date
+                strings are obfuscated.
+            in_place (bool): Whether date obfuscation may mutate the loaded data.  When False, the
+                input is left untouched and only containers holding a changed date are copied.
+                Cannot be combined with a schema.
+
+        Raises:
+            ValueError: If the transformation type is unsupported or does not fit the input/schema.
         """
         self.input_file = input_file
         self.output_file = output_file
         self.transformation_type = transformation_type
+        self.pretty = pretty
+        self.schema = schema
+        self.in_place = in_place
+        # Set once the input had to be decoded with json; it is then encoded with json as well.
+        self._stdlib_json = False
+
+        # Resolve the transformation and how its output is saved once, instead of on every call.
+        try:
+            self._transform, self._save_fn = {
+                'json_to_xml': (self.transform_json_to_xml, self.save_stream),
+                'date_obfuscation': (self.transform_date_format, self._save_transformed),
+            }[transformation_type]
+        except KeyError:
+            raise ValueError(f"Unsupported transformation type: {transformation_type}") from None
+        is_xml = input_file.lower().endswith('.xml')
+        if is_xml:
+            if transformation_type != 'date_obfuscation':
+                raise ValueError(f"Transformation type '{transformation_type}' requires JSON input.")
+            # Streamed XML is obfuscated straight into the output file.
+            self._transform, self._save_fn = self.transform_xml_dates, self.save_stream
+        if schema is not None and (is_xml or transformation_type != 'date_obfuscation'):
+            raise ValueError("A schema can only be used for date_obfuscation of JSON input.")
+        if schema is not None and not in_place:
+            # Schema-decoded data is private to this run and is always updated in place.
+            raise ValueError("A schema cannot be combined with in_place=False (copy-on-write).")
+
+        if transformation_type == 'json_to_xml':
+            # Faker's word() is slow per call, so draw the tag names once and cycle through them.
+            self._word_pool = fake.words(nb=_WORD_POOL_SIZE)
+            self._word_mask = _WORD_POOL_SIZE - 1
+            self._word_counter = 0
 
     def load_data(self):
         """
@@ -45,20 +270,29 @@ class DataFormatObfuscator:
             ValueError: If the file type is not supported.
         """
         try:
-            with open(self.input_file, 'r') as f:
-                if self.input_file.lower().endswith('.json'):
-                    return json.load(f)
-                elif self.input_file.lower().endswith('.xml'):
-                    # Parse XML directly.  The obfuscation logic can handle it.
-                    return ET.parse(f)
-                else:
-                    raise ValueError("Unsupported file type. Only JSON and XML are supported.")
+            if self.input_file.lower().endswith('.json'):
+                # Read raw bytes so orjson can validate UTF-8 itself instead of going through a text decoder.
+                with open(self.input_file, 'rb') as f:
+                    if _should_mmap(f):
+                        # Parse straight from the mapped pages, skipping the copy read() would make.
+                        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                            return self._decode_json(view)
+                    raw = f.read()
+                return self._decode_json(raw)
+            elif self.input_file.lower().endswith('.xml'):
+                # XML is parsed lazily so the whole document never has to be held in memory.
+                return self._iter_xml(self.input_file)
+            else:
+                raise ValueError("Unsupported file type. Only JSON and XML are supported.")
         except FileNotFoundError:
             logging.error(f"Input file not found: {self.input_file}")
             raise
         except json.JSONDecodeError:
             logging.error(f"Failed to decode JSON in file: {self.input_file}")
             raise
+        except _SCHEMA_ERRORS as e:
+            logging.error(f"Input does not match the schema in file: {self.input_file}")
+            raise ValueError(f"Input does not match the schema: {e}") from e
         except ET.ParseError:
             logging.error(f"Failed to parse XML in file: {self.input_file}")
             raise
@@ -66,86 +300,444 @@ class DataFormatObfuscator:
             logging.error(f"An unexpected error occurred while loading data: {e}")
             raise
 
+    def _decode_json(self, raw):
+        """
+        Decodes JSON bytes (or a buffer over them) with the fastest available decoder.
 
-    def transform_json_to_xml(self, data):
+        orjson is only used when it can return exactly what json would: input with very long
+        integers or with values it rejects (NaN, Infinity, lone surrogates) falls back to json.
+        """
+        if self.schema is not None:
+            # Only the schema's fields are materialized as Python objects.
+            return msgspec.json.decode(raw, type=self.schema)
+        if orjson is not None and not _LONG_DIGITS_RE.search(raw):
+            try:
+                return orjson.loads(raw)
+            except orjson.JSONDecodeError:
+                pass  # e.g. NaN or Infinity, which json accepts; genuine errors are raised below.
+        self._stdlib_json = True
+        return json.loads(bytes(raw))
+
+    def _iter_xml(self, path):
+        """
+        Incrementally parses XML, yielding iterparse (event, item) pairs.
+
+        Each element is cleared and detached from its parent once its 'end' event has been
+        handled, so memory use is bounded by the nesting depth rather than the file size.
+        Large files are parsed from a read-only memory map.
+
+        Args:
+            path (str): Path of the XML file.  It is only opened once iteration starts, and closed
+                when the generator finishes.
+        """
+        with open(path, 'rb') as f, (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if _should_mmap(f)
+                                     else contextlib.nullcontext(f)) as source:
+            if LET is not None:
+                # Like xml.etree, drop comments and PIs so the text after them is merged into the
+                # surrounding text instead of ending up as their tails.
+                for event, elem in LET.iterparse(source, events=_XML_EVENTS,
+                                                 remove_comments=True, remove_pis=True):
+                    yield event, elem
+                    if event == 'end':
+                        elem.clear(keep_tail=True)
+                        parent = elem.getparent()
+                        if parent is not None:
+                            while elem.getprevious() is not None:
+                                del parent[0]
+                return
+
+            # xml.etree elements have no parent pointer, so track the open ancestors ourselves.
+            parents = []
+            for event, elem in ET.iterparse(source, events=_XML_EVENTS):
+                if event == 'start':
+                    parents.append(elem)
+                yield event, elem
+                if event == 'end':
+                    parents.pop()
+                    # The tail may already have been parsed; keep it for the consumer.
+                    tail = elem.tail
+                    elem.clear()
+                    elem.tail = tail
+                    if parents:
+                        parents[-1].remove(elem)
+
+    def transform_json_to_xml(self, data, write):
         """
         Transforms JSON data to XML format with obfuscated field names.
 
+        The XML is written fragment by fragment as the JSON is walked, so neither an element
+        tree nor the serialized document is ever held in memory.  It is only indented when
+        pretty output was requested.
+
         Args:
             data (dict): JSON data to transform.
-
-        Returns:
-            str: XML representation of the data.
+            write (callable): Function that writes a str fragment to the output.
         """
         try:
-            root = ET.Element("root")  # Root element for XML
-            self._json_to_xml_recursive(data, root)
-            return self._prettify_xml(root)
+            write('<?xml version="1.0" encoding="utf-8"?>\n')
+            if not isinstance(data, (dict, list)):
+                write(f"<root>{escape(str(data))}</root>\n")
+            elif data:
+                indent = "  " if self.pretty else ""
+                write("<root>\n" if indent else "<root>")  # Root element for XML
+                self._json_to_xml_stream(data, write, indent, 1)
+                write("</root>\n")
+            else:
+                write("<root />\n")
         except Exception as e:
             logging.error(f"Error during JSON to XML transformation: {e}")
             raise
 
-    def _json_to_xml_recursive(self, data, parent):
+    def _json_to_xml_stream(self, data, write, indent, depth):
         """
-        Recursively converts JSON data to XML elements, obfuscating field names.
+        Recursively writes the children of a JSON container as XML elements, obfuscating field names.
 
         Args:
-            data (dict or list or str): JSON data to convert.
-            parent (xml.etree.ElementTree.Element): Parent XML element.
+            data (dict or list): JSON container whose values are written.
+            write (callable): Function that writes a str fragment to the output.
+            indent (str): Indentation added per nesting level; empty for compact output.
+            depth (int): Nesting level of the elements being written.
         """
-        if isinstance(data, dict):
-            for key, value in data.items():
-                obfuscated_key = fake.word()  # Generate a random word for the new key
-                element = ET.SubElement(parent, obfuscated_key)
-                self._json_to_xml_recursive(value, element)
-        elif isinstance(data, list):
-            for item in data:
-                element = ET.SubElement(parent, fake.word())  # use a random word for list items
-                self._json_to_xml_recursive(item, element)
-        else:
-            parent.text = str(data)
+        # Keys are replaced by random words, so only the values matter.
+        values = data.values() if isinstance(data, dict) else data
+        pad = indent * depth
+        nl = "\n" if indent else ""
+        # Leaf values (all of them, for the common flat record) are formatted in a tight loop over
+        # pre-bound locals and reach the writer as one fragment per run instead of one per value.
+        pool, mask, counter = self._word_pool, self._word_mask, self._word_counter
+        leaves = []
+        append = leaves.append
+        for value in values:
+            # Take the next random word for the new key
+            counter = (counter + 1) & mask
+            tag = pool[counter]
+            if not isinstance(value, (dict, list)):
+                append(f"{pad}<{tag}>{escape(str(value))}</{tag}>{nl}")
+                continue
+            if leaves:
+                write(''.join(leaves))
+                leaves.clear()
+            if value:
+                write(f"{pad}<{tag}>{nl}")
+                self._word_counter = counter
+                self._json_to_xml_stream(value, write, indent, depth + 1)
+                counter = self._word_counter
+                write(f"{pad}</{tag}>{nl}")
+            else:
+                write(f"{pad}<{tag} />{nl}")
+        self._word_counter = counter
+        if leaves:
+            write(''.join(leaves))
 
-    def _prettify_xml(self, elem):
+    def transform_date_format(self, data):
         """
-        Return a pretty-printed XML string for the Element.
+        Obfuscates date formats within the data.  This is applied to every nested value.
+
+        Containers are walked with an explicit stack, so arbitrarily deep data does not hit the
+        recursion limit, and strings are replaced in place rather than rebuilding each container.
+        The walk only records where candidate strings live; they are then tested in a single regex
+        scan and the matches reformatted in one flat loop.  With in_place=False the input is left
+        untouched and shared copy-on-write instead (see _share_dates).
+
+        Args:
+            data (any): The data structure to obfuscate (dict, list, string, etc.)
+
+        Returns:
+            any: The obfuscated data (the same container object, mutated in place, unless
+                in_place is False).
         """
         try:
-            rough_string = ET.tostring(elem, 'utf-8')
-            reparsed = xml.dom.minidom.parseString(rough_string)
-            return reparsed.toprettyxml(indent="  ")
+            if self.schema is not None:
+                return self._transform_schema_dates(data)
+            if not self.in_place:
+                return self._share_dates(data)[1]
+            if isinstance(data, str):
+                return self._obfuscate_date(data)
+            if not isinstance(data, (dict, list)):
+                return data  # Return non-string data unchanged
+
+            parents, keys, values = self._collect_date_candidates(data)
+            # Every candidate is exactly _DATE_LEN characters, so in the newline-joined text each
+            # one owns a fixed-width line and a match offset maps straight back to its index.
+            reformat = self._reformat_date
+            for match in _DATE_LINE_RE.finditer('\n'.join(values)):
+                i = match.start() // (_DATE_LEN + 1)
+                value = values[i]
+                new_value = reformat(value)
+                if new_value is not value:
+                    parents[i][keys[i]] = new_value
+            return data
         except Exception as e:
-            logging.error(f"Error prettifying XML: {e}")
-            return ET.tostring(elem, 'utf-8').decode('utf-8')
+            logging.error(f"Error during date format transformation: {e}")
+            raise
 
-    def transform_date_format(self, data):
+    def _transform_schema_dates(self, data):
         """
-        Obfuscates date formats within the data.  This is applied recursively.
+        Obfuscates the dates in data decoded with a msgspec schema.
+
+        Every datetime.date value the schema decoded is reformatted, and strings in untyped
+        fields still go through the regular date check.  Lists, dicts and mutable Structs and
+        dataclasses are updated in place.  Immutable containers (frozen Structs and dataclasses,
+        tuples, sets and frozensets) are rebuilt once their children are done.
 
         Args:
-            data (any): The data structure to obfuscate (dict, list, string, etc.)
+            data (any): Decoded data (Structs, dataclasses, containers or a single value).
+
+        Returns:
+            any: The obfuscated data (the same object unless the top level had to be rebuilt).
+        """
+        # (container, element snapshot or None, updates, parent, slot), parents first.  Children
+        # of an immutable container write into its updates dict instead of the container.
+        rebuilt = []
+
+        def assign(parent, slot, value):
+            if isinstance(parent, (list, dict)):
+                parent[slot] = value
+            else:
+                setattr(parent, slot, value)
+
+        # Walking from a holder list lets a top-level date or rebuilt container be replaced like
+        # any other value.
+        root = [data]
+        stack = deque([(root, None, None)])
+        while stack:
+            node, parent, slot = stack.pop()
+            target = node
+            if isinstance(node, (list, dict)):
+                items = node.items() if isinstance(node, dict) else enumerate(node)
+            elif isinstance(node, (tuple, set, frozenset)):
+                # Positions in a snapshot of the elements serve as slots; it is rebuilt from them.
+                values = list(node)
+                target = {}
+                rebuilt.append((node, values, target, parent, slot))
+                items = enumerate(values)
+            else:
+                if isinstance(node, msgspec.Struct):
+                    names, frozen = node.__struct_fields__, node.__struct_config__.frozen
+                else:
+                    names = [field.name for field in dataclasses.fields(node)]
+                    frozen = node.__dataclass_params__.frozen
+                if frozen:
+                    target = {}
+                    rebuilt.append((node, None, target, parent, slot))
+                items = [(name, getattr(node, name)) for name in names]
+            for key, value in items:
+                if type(value) is datetime.date:
+                    assign(target, key, value.strftime(_FMTS[random.getrandbits(2)]))
+                elif isinstance(value, str):
+                    new_value = self._obfuscate_date(value)
+                    if new_value is not value:
+                        assign(target, key, new_value)
+                elif (isinstance(value, (msgspec.Struct, dict, list, tuple, set, frozenset))
+                      or dataclasses.is_dataclass(value)):
+                    stack.append((value, target, key))
+
+        # Children were discovered after their parents, so rebuilding in reverse order lets each
+        # replacement land in its parent's updates before the parent itself is rebuilt.
+        for node, values, updates, parent, slot in reversed(rebuilt):
+            if not updates:
+                continue
+            if values is None:
+                replace = msgspec.structs.replace if isinstance(node, msgspec.Struct) else dataclasses.replace
+                new_node = replace(node, **updates)
+            else:
+                for index, value in updates.items():
+                    values[index] = value
+                # NamedTuples take their fields as separate arguments.
+                new_node = node._make(values) if hasattr(node, '_make') else type(node)(values)
+            assign(parent, slot, new_node)
+        return root[0]
+
+    def _share_dates(self, data):
+        """
+        Copy-on-write date obfuscation that never mutates its input.
+
+        Subtrees without a date are returned as the very same objects, so only the containers on
+        the path to a changed date are copied.  Like the in-place walk it uses an explicit stack.
+
+        Args:
+            data (any): The data structure to obfuscate.
+
+        Returns:
+            tuple: (changed, result), where result is data itself when changed is False.
+        """
+        if isinstance(data, str):
+            new_value = self._obfuscate_date(data)
+            return new_value is not data, new_value
+        if not isinstance(data, (dict, list)):
+            return False, data
+
+        def materialize(frame):
+            # Copy the frame's container and any not-yet-copied ancestors, linking each new copy
+            # into its parent's copy.  Later writes to a copy are then already visible upstream.
+            chain = []
+            while frame is not None and frame[1] is None:
+                frame[1] = frame[0].copy()
+                chain.append(frame)
+                frame = frame[2]
+            for _, copy, parent, slot in chain:
+                if parent is not None:
+                    parent[1][slot] = copy
+
+        # Frames are [container, copy or None, parent frame, slot in parent].
+        root = [data, None, None, None]
+        stack = deque([root])
+        while stack:
+            frame = stack.pop()
+            node = frame[0]
+            for key, value in (node.items() if isinstance(node, dict) else enumerate(node)):
+                if isinstance(value, str):
+                    new_value = self._obfuscate_date(value)
+                    if new_value is not value:
+                        materialize(frame)
+                        frame[1][key] = new_value
+                elif isinstance(value, (dict, list)):
+                    stack.append([value, None, frame, key])
+        if root[1] is None:
+            return False, data
+        return True, root[1]
+
+    def _collect_date_candidates(self, data):
+        """
+        Walks nested dicts and lists and records every string of date length (10 characters).
+
+        Only the length is checked here; transform_date_format tests the date shape afterwards.
+
+        Args:
+            data (dict or list): The container to walk.
+
+        Returns:
+            tuple: Parallel lists (parents, keys, values) where parents[i][keys[i]] is values[i].
+        """
+        parents, keys, values = [], [], []
+        # Only containers go on the stack; strings are recorded as their parent is scanned.
+        stack = deque([data])
+        while stack:
+            node = stack.pop()
+            for key, value in (node.items() if isinstance(node, dict) else enumerate(node)):
+                if isinstance(value, str):
+                    if len(value) == _DATE_LEN:
+                        parents.append(node)
+                        keys.append(key)
+                        values.append(value)
+                elif isinstance(value, (dict, list)):
+                    stack.append(value)
+        return parents, keys, values
+
+    def _obfuscate_date(self, value):
+        """
+        Reformats a date string with a randomly chosen format.
+
+        Args:
+            value (str): The string to obfuscate.
 
         Returns:
-            any: The obfuscated data.
+            str: The reformatted date, or the original string if it is not a recognizable date.
+        """
+        # The length test rejects almost every non-date without entering the regex engine.
+        if len(value) != _DATE_LEN or not _DATE_RE.match(value):
+            return value
+        return self._reformat_date(value)
+
+    def _reformat_date(self, value):
         """
+        Reformats a string already known to have the YYYY-MM-DD shape.
+
+        Args:
+            value (str): The date string.
+
+        Returns:
+            str: The reformatted date, or the original string if it is not a valid date.
+        """
+        # Attempt to parse as date and reformat.  The regex has pinned the YYYY-MM-DD shape, so the
+        # C-level ISO parser accepts exactly what strptime('%Y-%m-%d') would, ~40x faster.
         try:
-            if isinstance(data, dict):
-                return {k: self.transform_date_format(v) for k, v in data.items()}
-            elif isinstance(data, list):
-                return [self.transform_date_format(item) for item in data]
-            elif isinstance(data, str):
-                # Attempt to parse as date and reformat
-                try:
-                    date_obj = datetime.datetime.strptime(data, '%Y-%m-%d') # Common format - adjust as needed.
-                    new_format = random.choice(['%m/%d/%Y', '%d.%m.%Y', '%Y/%m/%d', '%d-%b-%Y'])
-                    return date_obj.strftime(new_format)
-                except ValueError:
-                    # Not a recognizable date, return the original string
-                    return data
+            date_obj = datetime.date.fromisoformat(value)
+        except ValueError:
+            # Not a recognizable date (e.g. 2020-13-45), return the original string
+            return value
+        return date_obj.strftime(_FMTS[random.getrandbits(2)])
+
+    def transform_xml_dates(self, events, write):
+        """
+        Obfuscates date formats in streamed XML, writing the result as the events are consumed.
+
+        Element text, tails and attribute values are passed through the date obfuscation.
+
+        Args:
+            events (iterator): (event, item) pairs as produced by _iter_xml.
+            write (callable): Function that writes a str fragment to the output.
+        """
+        write('<?xml version="1.0" encoding="utf-8"?>\n')
+        # Namespace prefixes currently in scope (prefix -> uri), plus one frame per open element
+        # holding its written name and the bindings its declarations shadowed.
+        bindings = {'xml': _XML_NAMESPACE}
+        frames = []
+        new_namespaces = []
+        # Character data following a tag is only complete once the parser reports the next
+        # tag, so it is written lazily from the (element, 'text' | 'tail') pair kept here.
+        pending = None
+
+        def declare(declared, shadowed, prefix, uri):
+            if prefix not in shadowed:
+                shadowed[prefix] = bindings.get(prefix)
+            bindings[prefix] = uri
+            declared.append((prefix, uri))
+
+        def qname(name, declared, shadowed, attribute=False):
+            if name[:1] != '{':
+                return name
+            uri, local = name[1:].split('}', 1)
+            # Only a prefix still bound to uri here is usable; unprefixed attributes have no
+            # namespace, so attributes can never use the default prefix.
+            for prefix, bound in bindings.items():
+                if bound == uri and (prefix or not attribute):
+                    break
             else:
-                return data # Return non-string data unchanged
-        except Exception as e:
-            logging.error(f"Error during date format transformation: {e}")
-            raise
+                n = 0
+                while f"ns{n}" in bindings:
+                    n += 1
+                prefix = f"ns{n}"
+                declare(declared, shadowed, prefix, uri)
+            return f"{prefix}:{local}" if prefix else local
+
+        for event, item in events:
+            if event == 'start-ns':
+                new_namespaces.append(item)
+                continue
+
+            if pending is not None:
+                text = getattr(*pending)
+                if text:
+                    write(escape(self._obfuscate_date(text)))
+                pending = None
+
+            if event == 'start':
+                declared, shadowed = [], {}
+                for prefix, uri in new_namespaces:
+                    declare(declared, shadowed, prefix or '', uri)
+                new_namespaces.clear()
+                tag = qname(item.tag, declared, shadowed)
+                attrs = [f" {qname(name, declared, shadowed, attribute=True)}={quoteattr(self._obfuscate_date(value))}"
+                         for name, value in item.attrib.items()]
+                parts = [f"<{tag}"]
+                for prefix, uri in declared:
+                    parts.append(f" xmlns:{prefix}={quoteattr(uri)}" if prefix else f" xmlns={quoteattr(uri)}")
+                parts.extend(attrs)
+                parts.append(">")
+                write(''.join(parts))
+                frames.append((tag, shadowed))
+                pending = (item, 'text')
+            else:
+                tag, shadowed = frames.pop()
+                write(f"</{tag}>")
+                for prefix, uri in shadowed.items():
+                    if uri is None:
+                        del bindings[prefix]
+                    else:
+                        bindings[prefix] = uri
+                pending = (item, 'tail')
+        write('\n')
 
     def process_data(self):
         """
@@ -153,44 +745,67 @@ class DataFormatObfuscator:
         """
         try:
             data = self.load_data()
+            self._save_fn(self._transform, data)
+        except Exception as e:
+            logging.error(f"Data processing failed: {e}")
+            raise
 
-            if self.transformation_type == 'json_to_xml':
-                transformed_data = self.transform_json_to_xml(data)
-            elif self.transformation_type == 'date_obfuscation':
-                transformed_data = self.transform_date_format(data)
-            else:
-                raise ValueError(f"Unsupported transformation type: {self.transformation_type}")
+    def _save_transformed(self, transform, data):
+        """
+        Runs a transformation that returns its result and saves that result as JSON.
 
-            self.save_data(transformed_data)
+        Args:
+            transform (callable): Transformation taking the loaded data.
+            data (any): The loaded data to transform.
+        """
+        self.save_data(transform(data))
 
+    def save_data(self, data):
+        """
+        Saves the transformed data to the output file as JSON.
+
+        Args:
+            data (any): The transformed data to save.
+        """
+        try:
+            # The serialized output is written with a single write() call.
+            with _open_output(self.output_file, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+                f.write(self._dump_json(data))
+            logging.info(f"Data saved to {self.output_file}")
         except Exception as e:
-            logging.error(f"Data processing failed: {e}")
+            logging.error(f"Failed to save data to file: {self.output_file}. Error: {e}")
             raise
 
-    def save_data(self, data):
+    def save_stream(self, transform, data):
         """
-        Saves the transformed data to the output file.
+        Runs a streaming transformation, writing its output directly to the output file.
+
+        Lazily parsed input can fail part-way through, so an existing output file is only replaced
+        once the transformation has finished (see _open_output).
 
         Args:
-            data (str or any): The transformed data to save.
+            transform (callable): Transformation taking (data, write).
+            data (any): The loaded data to transform.
         """
         try:
-            with open(self.output_file, 'w') as f:
-                if self.transformation_type == 'json_to_xml':
-                    f.write(data)
-                elif self.transformation_type == 'date_obfuscation':
-                    # For date obfuscation, try to dump back to JSON if the original was JSON.  Otherwise, just write the string.
-                    if self.input_file.lower().endswith('.json'):
-                        json.dump(data, f, indent=4)
-                    else:
-                        f.write(str(data))  # Handle cases where the input wasn't JSON.
-                else:
-                    f.write(str(data))
+            # Transformations emit many small fragments; a large buffer batches them into few syscalls.
+            with _open_output(self.output_file, 'w', encoding='utf-8', buffering=_WRITE_BUFFER_SIZE) as f:
+                transform(data, f.write)
             logging.info(f"Data saved to {self.output_file}")
         except Exception as e:
             logging.error(f"Failed to save data to file: {self.output_file}. Error: {e}")
             raise
 
+    def _dump_json(self, data):
+        """
+        Serializes data to indented UTF-8 JSON bytes, using orjson when it also decoded the input.
+        """
+        if self.schema is not None:
+            return msgspec.json.format(msgspec.json.encode(data), indent=2)
+        if orjson is not None and not self._stdlib_json:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
 
 def setup_argparse():
     """
@@ -203,6 +818,9 @@ def setup_argparse():
     parser.add_argument("-i", "--input", dest="input_file", required=True, help="Path to the input file.")
     parser.add_argument("-o", "--output", dest="output_file", required=True, help="Path to the output file.")
     parser.add_argument("-t", "--type", dest="transformation_type", required=True, choices=['json_to_xml', 'date_obfuscation'], help="Type of transformation to apply (json_to_xml, date_obfuscation).")
+    parser.add_argument("--pretty", action="store_true", help="Indent generated XML for readability.")
+    parser.add_argument("--copy-on-write", action="store_true", help="Obfuscate dates without mutating the loaded data; only containers holding a changed date are copied. Cannot be combined with --schema.")
+    parser.add_argument("--schema", dest="schema_file", help="Python file defining a msgspec 'Schema' type; JSON input is decoded with it for date_obfuscation (requires msgspec).")
     return parser
 
 def main():
@@ -217,7 +835,9 @@ def main():
         if not os.path.exists(args.input_file):
             raise FileNotFoundError(f"The input file '{args.input_file}' does not exist.")
 
-        obfuscator = DataFormatObfuscator(args.input_file, args.output_file, args.transformation_type)
+        schema = _load_schema(args.schema_file) if args.schema_file else None
+        obfuscator = DataFormatObfuscator(args.input_file, args.output_file, args.transformation_type,
+                                          pretty=args.pretty, schema=schema, in_place=not args.copy_on_write)
         obfuscator.process_data()
 
         logging.info("Data obfuscation completed successfully.")
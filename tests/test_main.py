@@ -0,0 +1,251 @@
+import contextlib
+import copy
+import dataclasses
+import datetime
+import logging
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+import main
+
+logging.disable(logging.CRITICAL)
+
+if main.msgspec is not None:
+    import msgspec
+
+    class Inner(msgspec.Struct, frozen=True):
+        day: datetime.date
+        note: str
+        tags: tuple[str, ...] = ()
+
+    class Middle(msgspec.Struct):
+        inner: Inner
+        items: list[Inner]
+
+    class Schema(msgspec.Struct, frozen=True):
+        born: datetime.date
+        extra: dict
+        middle: Middle
+        top: Inner
+
+    @dataclasses.dataclass(frozen=True)
+    class Record:
+        day: datetime.date
+        tags: frozenset[str]
+
+
+class XmlDateObfuscationTest(unittest.TestCase):
+    """
+    Streams XML through transform_xml_dates on every available parser backend.
+    """
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+
+    def backends(self):
+        """
+        Yields the backend names, with main.LET patched accordingly while each one runs.
+        """
+        if main.LET is not None:
+            yield 'lxml'
+        with mock.patch.object(main, 'LET', None):
+            yield 'xml.etree'
+
+    def obfuscate(self, xml):
+        """
+        Writes xml to an input file, obfuscates its dates and returns the output document.
+        """
+        input_file = os.path.join(self._dir.name, 'in.xml')
+        output_file = os.path.join(self._dir.name, 'out.xml')
+        with open(input_file, 'w', encoding='utf-8') as f:
+            f.write(xml)
+        main.DataFormatObfuscator(input_file, output_file, 'date_obfuscation').process_data()
+        with open(output_file, encoding='utf-8') as f:
+            return f.read()
+
+    def assertSameTree(self, expected, actual):
+        def names(xml):
+            return [(e.tag, sorted(e.attrib.items())) for e in ET.fromstring(xml).iter()]
+        self.assertEqual(names(expected), names(actual))
+
+    def test_namespaces_round_trip(self):
+        documents = [
+            # A second prefix for the same URI goes out of scope before a sibling uses the first.
+            '<r xmlns:a="urn:u"><x xmlns:b="urn:u"><b:y/></x><a:z/></r>',
+            # The default namespace never qualifies attributes; a shadowed prefix is rebound.
+            '<r xmlns="urn:d" xmlns:p="urn:d" a="1" p:b="x">'
+            '<c xmlns="urn:e" p:q="x" xmlns:p="urn:other"><d/></c><e xmlns=""/></r>',
+            '<r xmlns="urn:d"><x xmlns:p="urn:d" p:a="1"/><y/></r>',
+        ]
+        for backend in self.backends():
+            for xml in documents:
+                with self.subTest(backend=backend, xml=xml):
+                    self.assertSameTree(xml, self.obfuscate(xml))
+
+    def test_text_after_comment_and_pi_is_kept(self):
+        for backend in self.backends():
+            with self.subTest(backend=backend):
+                out = self.obfuscate('<r>x<!--c-->y<?pi z?>tail<b/><!--q-->after</r>')
+                self.assertEqual(ET.fromstring(out).text, 'xytail')
+                self.assertEqual(ET.fromstring(out)[0].tail, 'after')
+
+    def test_dates_in_text_and_attributes_are_obfuscated(self):
+        for backend in self.backends():
+            with self.subTest(backend=backend):
+                root = ET.fromstring(self.obfuscate('<r d="2020-01-02"><a>2021-03-04</a>2020-13-45</r>'))
+                self.assertNotEqual(root.get('d'), '2020-01-02')
+                self.assertNotEqual(root[0].text, '2021-03-04')
+                self.assertEqual(root[0].tail, '2020-13-45')
+
+
+class OutputFileTest(unittest.TestCase):
+    """
+    Checks how save_stream and save_data treat an existing output path.
+    """
+
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self._dir.cleanup)
+
+    def path(self, name, content=None):
+        path = os.path.join(self._dir.name, name)
+        if content is not None:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(content)
+        return path
+
+    def test_parse_error_keeps_existing_output(self):
+        output_file = self.path('out.xml', 'keep')
+        obfuscator = main.DataFormatObfuscator(self.path('in.xml', '<r>2020-01-02<b/>'), output_file,
+                                               'date_obfuscation')
+        with self.assertRaises(Exception):
+            obfuscator.process_data()
+        with open(output_file, encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'keep')
+        # The temporary file is removed again.
+        self.assertEqual(sorted(os.listdir(self._dir.name)), ['in.xml', 'out.xml'])
+
+    def test_symlinks_and_hard_links_are_written_through(self):
+        for transformation_type, input_file in [('json_to_xml', self.path('in.json', '{"a": 1}')),
+                                                ('date_obfuscation', self.path('in.xml', '<r>1</r>'))]:
+            with self.subTest(transformation_type=transformation_type, link='symlink'):
+                target = self.path('target.xml', 'old')
+                link = self.path('link.xml')
+                os.symlink(target, link)
+                main.DataFormatObfuscator(input_file, link, transformation_type).process_data()
+                self.assertTrue(os.path.islink(link))
+                with open(target, encoding='utf-8') as f:
+                    self.assertNotEqual(f.read(), 'old')
+                os.unlink(link)
+            with self.subTest(transformation_type=transformation_type, link='hard link'):
+                other = self.path('other.xml', 'old')
+                link = self.path('hard.xml')
+                os.link(other, link)
+                main.DataFormatObfuscator(input_file, link, transformation_type).process_data()
+                with open(other, encoding='utf-8') as f:
+                    self.assertNotEqual(f.read(), 'old')
+                os.unlink(link)
+
+
+@unittest.skipIf(main.msgspec is None, "msgspec is not installed")
+class SchemaDateObfuscationTest(unittest.TestCase):
+    """
+    Runs _transform_schema_dates over data decoded with msgspec schemas.
+    """
+
+    def obfuscate(self, schema, document):
+        obfuscator = main.DataFormatObfuscator('in.json', 'out.json', 'date_obfuscation', schema=schema)
+        data = msgspec.json.decode(msgspec.json.encode(document), type=schema)
+        return obfuscator.transform_date_format(data)
+
+    def assertObfuscated(self, value, date):
+        """
+        Asserts that value is the ISO date rewritten in one of the obfuscation formats.
+        """
+        self.assertNotEqual(value, date)
+        parsed = set()
+        for fmt in main._FMTS:
+            with contextlib.suppress(ValueError):
+                parsed.add(datetime.datetime.strptime(value, fmt).date().isoformat())
+        self.assertIn(date, parsed)
+
+    def test_frozen_and_nested_structs(self):
+        inner = {"day": "2000-01-01", "note": "2002-02-02", "tags": ["2003-03-03", "x"]}
+        result = self.obfuscate(Schema, {
+            "born": "1990-05-17",
+            "extra": {"a": "1999-12-31", "b": [{"c": "2001-01-01"}], "n": 3},
+            "middle": {"inner": inner, "items": [inner]},
+            "top": inner,
+        })
+        self.assertIsInstance(result, Schema)
+        self.assertObfuscated(result.born, "1990-05-17")
+        self.assertObfuscated(result.extra["a"], "1999-12-31")
+        self.assertObfuscated(result.extra["b"][0]["c"], "2001-01-01")
+        self.assertEqual(result.extra["n"], 3)
+        for value in (result.middle.inner, result.middle.items[0], result.top):
+            self.assertIsInstance(value, Inner)
+            self.assertObfuscated(value.day, "2000-01-01")
+            self.assertObfuscated(value.note, "2002-02-02")
+            self.assertObfuscated(value.tags[0], "2003-03-03")
+            self.assertEqual(value.tags[1], "x")
+
+    def test_dataclasses_sets_and_top_level_values(self):
+        result = self.obfuscate(list[Record], [{"day": "2020-01-02", "tags": ["2020-03-04"]}])
+        self.assertIsInstance(result[0], Record)
+        self.assertObfuscated(result[0].day, "2020-01-02")
+        self.assertIsInstance(result[0].tags, frozenset)
+        self.assertObfuscated(next(iter(result[0].tags)), "2020-03-04")
+        self.assertObfuscated(self.obfuscate(datetime.date, "2020-01-02"), "2020-01-02")
+        self.assertEqual(self.obfuscate(int, 3), 3)
+
+
+class CopyOnWriteTest(unittest.TestCase):
+    """
+    Checks that date obfuscation with in_place=False leaves its input alone.
+    """
+
+    def setUp(self):
+        self.obfuscator = main.DataFormatObfuscator('in.json', 'out.json', 'date_obfuscation', in_place=False)
+
+    def test_input_is_not_mutated_and_date_free_subtrees_are_shared(self):
+        data = {
+            "born": "1990-05-17",
+            "plain": {"a": [1, "x"], "b": {}},
+            "nested": {"deep": [{"when": "2000-01-02"}], "other": ["y"]},
+        }
+        snapshot = copy.deepcopy(data)
+        result = self.obfuscator.transform_date_format(data)
+        self.assertEqual(data, snapshot)
+        self.assertNotEqual(result["born"], "1990-05-17")
+        self.assertNotEqual(result["nested"]["deep"][0]["when"], "2000-01-02")
+        # Only the containers on the path to a changed date are copied.
+        self.assertIsNot(result, data)
+        self.assertIsNot(result["nested"], data["nested"])
+        self.assertIsNot(result["nested"]["deep"][0], data["nested"]["deep"][0])
+        self.assertIs(result["plain"], data["plain"])
+        self.assertIs(result["nested"]["other"], data["nested"]["other"])
+
+    def test_unchanged_input_is_returned_as_is(self):
+        data = {"a": [1, {"b": "2020-13-45"}]}
+        self.assertIs(self.obfuscator.transform_date_format(data), data)
+
+    def test_deep_nesting(self):
+        data = []
+        for _ in range(5000):
+            data = [data, "2020-01-02"]
+        result = self.obfuscator.transform_date_format(data)
+        self.assertEqual(data[1], "2020-01-02")
+        self.assertNotEqual(result[0][0][1], "2020-01-02")
+
+    @unittest.skipIf(main.msgspec is None, "msgspec is not installed")
+    def test_schema_is_rejected(self):
+        with self.assertRaises(ValueError):
+            main.DataFormatObfuscator('in.json', 'out.json', 'date_obfuscation', schema=dict, in_place=False)
+
+
+if __name__ == '__main__':
+    unittest.main()